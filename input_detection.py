@@ -1,12 +1,24 @@
 #!/usr/bin/env python3
 
+import logging
 import cv2
 import numpy as np
 import pytesseract
+from pytesseract import Output
 import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, Optional, Tuple, List
 import pyautogui
+import mss
+
+logger = logging.getLogger(__name__)
+
+# Keep Tesseract single-threaded; OpenMP thread contention slows short OCR calls
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
 
 @dataclass
 class InputBox:
@@ -22,19 +34,497 @@ class InputBox:
 class InputDetector:
     """Detects input boxes in UI screenshots"""
     
-    def __init__(self, debug: bool = False):
+    # Template images for Cascade's input box (light and dark theme)
+    TEMPLATE_PATHS = ('screenshots/input.png', 'screenshots/input_new.png')
+    
+    # Optional arrow icon templates, keyed by is_up_arrow
+    ARROW_TEMPLATE_PATHS = {True: 'screenshots/arrow_up.png', False: 'screenshots/arrow_down.png'}
+    
+    # Default confidence threshold for each supported matching method
+    MATCH_THRESHOLDS = {
+        cv2.TM_CCOEFF_NORMED: 0.6,
+        cv2.TM_CCORR_NORMED: 0.9,
+        cv2.TM_SQDIFF_NORMED: 0.9,  # Confidence is 1 - squared difference
+    }
+    
+    def __init__(self, debug: bool = False, match_method: int = cv2.TM_CCOEFF_NORMED,
+                 binarize: bool = False):
         """Initialize the detector
         
         Args:
             debug: If True, save debug images during detection
+            match_method: Normalized OpenCV template matching method; TM_SQDIFF_NORMED
+                and TM_CCORR_NORMED take fewer passes than TM_CCOEFF_NORMED but are
+                not brightness-invariant, so flat UI areas score higher
+            binarize: If True, Otsu-threshold templates and search regions and
+                match the binary images
         """
+        if match_method not in self.MATCH_THRESHOLDS:
+            raise ValueError(f"Unsupported template matching method: {match_method}")
         self.debug = debug
         self.debug_dir = "debug_screenshots"
         if debug:
             self._ensure_debug_dir()
         
+        # Debug images are PNG-encoded on a background thread, off the detection path
+        # (the worker thread is only started by the first write). Only the newest
+        # pending image per file is kept, so a slow disk can't queue up frames.
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        self._debug_pending: Dict[str, np.ndarray] = {}
+        self._debug_lock = threading.Lock()
+        
         # Default coordinates for Cascade input area as fallback
         self.default_input_coords = (500, 500)
+        
+        # Placeholder detection candidate filtering
+        self.max_pixel_fill = 0.95  # Region pixels / bounding box area
+        self.max_ocr_candidates = 5
+        
+        # Per-thread screen grabbers for capture_window_screenshot
+        self._capture_local = threading.local()
+        
+        # Last (frame, grayscale) pair so detectors share one conversion per frame
+        self._gray_cache = None
+        
+        # Per-frame buffers reused across frames while the window size is unchanged
+        self._buffers: Dict[tuple, np.ndarray] = {}
+        
+        # Templates never change, so decode them once straight to grayscale
+        self._templates_gray = self._load_templates(self.TEMPLATE_PATHS)
+        
+        # Arrow templates are optional; without one the shape search is used
+        self._arrow_templates = {}
+        for is_up_arrow, path in self.ARROW_TEMPLATE_PATHS.items():
+            loaded = self._load_templates([path]) if os.path.exists(path) else []
+            if loaded:
+                self._arrow_templates[is_up_arrow] = loaded[0]
+        self.arrow_threshold = 0.8
+        
+        # Template matching configuration
+        self.match_method = match_method
+        self.match_threshold = self.MATCH_THRESHOLDS[match_method]
+        self.binarize = binarize
+        if binarize:
+            self._templates_gray = [self._binarize(t) for t in self._templates_gray]
+        self._templates_pyr = [self._half_size(t) for t in self._templates_gray]
+        
+        # Coarse-to-fine matching: search at half resolution, refine peaks
+        self.use_pyramid = True
+        # Coarse peaks are kept down to this far below match_threshold
+        self.coarse_margin = 0.2
+        self.pyramid_peaks = 3
+        self.pyramid_margin = 4
+        
+        # The input box sits low in the Cascade panel, so skip the top of the window
+        self.search_top_frac = 0.3
+        
+        # Optional FFT cross-correlation for large templates (TM_CCOEFF_NORMED only).
+        # One forward FFT of the search region is shared by all templates.
+        self.use_fft = False
+        self.fft_min_template_area = 25 * 25
+        self._template_ffts: Dict[tuple, Tuple[np.ndarray, float]] = {}
+        self._search_fft = None
+        self._search_integrals = None
+        
+        # Match on the GPU when OpenCV was built with CUDA and a device exists
+        self.use_cuda = self._init_cuda_matching()
+        
+        # Match results as parallel arrays (x, y, width, height, confidence)
+        template_count = len(self._templates_gray)
+        self._match_x = np.empty(template_count, dtype=np.int32)
+        self._match_y = np.empty(template_count, dtype=np.int32)
+        self._match_w = np.empty(template_count, dtype=np.int32)
+        self._match_h = np.empty(template_count, dtype=np.int32)
+        self._match_conf = np.empty(template_count, dtype=np.float32)
+        
+        # The template that matched last is tried first; a score above this
+        # skips the others (e.g. the other theme's template). Never below
+        # match_threshold, which is checked when matching
+        self.early_exit_threshold = 0.85
+        self._last_template: Optional[int] = None
+        
+        # CPU matching runs one thread per template
+        self._match_pool = ThreadPoolExecutor(max_workers=max(1, len(self._templates_gray)))
+    
+    def _load_templates(self, paths) -> List[np.ndarray]:
+        """Load template images as contiguous grayscale arrays
+        
+        Args:
+            paths: Template image paths
+            
+        Returns:
+            List of grayscale templates that could be loaded
+        """
+        templates = []
+        for path in paths:
+            template = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if template is None:
+                logger.warning("Could not load template image: %s", path)
+                continue
+            templates.append(np.ascontiguousarray(template, dtype=np.uint8))
+        return templates
+    
+    def _init_cuda_matching(self) -> bool:
+        """Upload templates to the GPU and create CUDA template matchers
+        
+        Returns:
+            True if CUDA matching is available, False to use the CPU path
+        """
+        try:
+            if not hasattr(cv2, 'cuda') or cv2.cuda.getCudaEnabledDeviceCount() == 0:
+                return False
+            
+            # Templates stay resident on the GPU, one matcher per template
+            self._gpu_templates = []
+            self._gpu_matchers = []
+            for template in self._templates_gray:
+                gpu_template = cv2.cuda_GpuMat()
+                gpu_template.upload(template)
+                self._gpu_templates.append(gpu_template)
+                self._gpu_matchers.append(
+                    cv2.cuda.createTemplateMatching(cv2.CV_8UC1, self.match_method))
+            
+            # Persistent buffers reused for every frame
+            self._gpu_search = cv2.cuda_GpuMat()
+            self._gpu_result = cv2.cuda_GpuMat()
+            logger.info("Using CUDA for template matching")
+            return True
+            
+        except cv2.error as e:
+            logger.info("CUDA template matching unavailable, using CPU: %s", e)
+            return False
+    
+    def _upload_search_image(self, search: np.ndarray) -> bool:
+        """Upload the search region to the persistent GPU buffer
+        
+        Args:
+            search: Grayscale region to search in
+            
+        Returns:
+            True if the upload succeeded, False if CUDA should be disabled
+        """
+        try:
+            self._gpu_search.upload(search)
+            return True
+        except cv2.error as e:
+            logger.warning("CUDA upload failed, falling back to CPU: %s", e)
+            self.use_cuda = False
+            return False
+    
+    def _match_coarse_to_fine(self, search: np.ndarray, search_small: np.ndarray,
+                              index: int) -> Tuple[float, Tuple[int, int]]:
+        """Match at half resolution, then re-score the best peaks at full resolution
+        
+        Args:
+            search: Grayscale region to search in
+            search_small: search at half size (see _half_size)
+            index: Index of the template in the template cache
+            
+        Returns:
+            Tuple of (confidence, (x, y)) for the best match in search
+        """
+        template = self._templates_gray[index]
+        template_small = self._templates_pyr[index]
+        th, tw = template.shape
+        ch, cw = template_small.shape
+        
+        coarse = self._match_scores(search_small, template_small, ('coarse', index))
+        
+        coarse_threshold = self.match_threshold - self.coarse_margin
+        best_val, best_loc = -1.0, (0, 0)
+        for peak in range(self.pyramid_peaks):
+            _, peak_val, _, (px, py) = cv2.minMaxLoc(coarse)
+            if peak == 0:
+                best_val, best_loc = peak_val, (px * 2, py * 2)
+            if peak_val < coarse_threshold:
+                break
+            
+            # Suppress this peak so the next iteration finds another one
+            coarse[max(0, py - ch//2):py + ch//2 + 1, max(0, px - cw//2):px + cw//2 + 1] = -1.0
+            
+            # Re-score a small window around the peak at full resolution
+            m = self.pyramid_margin
+            x0, y0 = max(0, px*2 - m), max(0, py*2 - m)
+            x1 = min(search.shape[1], px*2 + tw + m)
+            y1 = min(search.shape[0], py*2 + th + m)
+            fine = self._match_scores(search[y0:y1, x0:x1], template, ('fine', index))
+            _, val, _, (fx, fy) = cv2.minMaxLoc(fine)
+            
+            if peak == 0 or val > best_val:
+                best_val, best_loc = val, (x0 + fx, y0 + fy)
+        
+        return best_val, best_loc
+    
+    def _match_template(self, search: np.ndarray, index: int,
+                        search_small: Optional[np.ndarray] = None) -> Tuple[float, Tuple[int, int]]:
+        """Match a cached template against the search region
+        
+        Args:
+            search: Grayscale region to search in
+            index: Index of the template in the template cache
+            search_small: Optional downsampled search region for coarse-to-fine matching
+            
+        Returns:
+            Tuple of (confidence, (x, y)) for the best match
+        """
+        if self.use_cuda:
+            try:
+                self._gpu_result = self._gpu_matchers[index].match(
+                    self._gpu_search, self._gpu_templates[index], self._gpu_result)
+                # Only the extrema come back from the GPU, not the result map
+                min_val, max_val, min_loc, max_loc = cv2.cuda.minMaxLoc(self._gpu_result)
+                if self.match_method == cv2.TM_SQDIFF_NORMED:
+                    return 1.0 - min_val, min_loc
+                return max_val, max_loc
+            except cv2.error as e:
+                logger.warning("CUDA template matching failed, falling back to CPU: %s", e)
+                self.use_cuda = False
+        
+        if self._use_fft_for(index):
+            return self._match_fft(search, index)
+        
+        if search_small is not None:
+            return self._match_coarse_to_fine(search, search_small, index)
+        
+        result = self._match_scores(search, self._templates_gray[index], ('result', index))
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return max_val, max_loc
+    
+    def _use_fft_for(self, index: int) -> bool:
+        """Check whether a template should be matched in the frequency domain"""
+        return (self.use_fft and not self.use_cuda
+                and self.match_method == cv2.TM_CCOEFF_NORMED
+                and self._templates_gray[index].size >= self.fft_min_template_area)
+    
+    def _prepare_fft(self, search: np.ndarray):
+        """Compute the search region FFT and integral images shared by all templates
+        
+        Args:
+            search: Grayscale region to search in
+        """
+        # Spectra are kept in single precision to halve the bytes moved by the
+        # per-template multiply; the error is far below the match threshold
+        self._search_fft = np.fft.rfft2(search).astype(np.complex64)
+        self._search_integrals = cv2.integral2(search, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    
+    def _match_fft(self, search: np.ndarray, index: int) -> Tuple[float, Tuple[int, int]]:
+        """Compute TM_CCOEFF_NORMED through FFT cross-correlation
+        
+        _prepare_fft() must have been called for the same search region.
+        
+        Args:
+            search: Grayscale region to search in
+            index: Index of the template in the template cache
+            
+        Returns:
+            Tuple of (confidence, (x, y)) for the best match
+        """
+        th, tw = self._templates_gray[index].shape
+        sh, sw = search.shape
+        
+        # Conjugate FFT of the zero-mean template, cached per search size
+        key = (index, search.shape)
+        cached = self._template_ffts.get(key)
+        if cached is None:
+            template = self._templates_gray[index].astype(np.float64)
+            template -= template.mean()
+            cached = (np.conj(np.fft.rfft2(template, s=search.shape)).astype(np.complex64),
+                      float(np.sqrt((template * template).sum())))
+            self._template_ffts[key] = cached
+        template_fft, template_norm = cached
+        
+        # Circular correlation; the valid region has no wrap-around
+        corr = np.fft.irfft2(self._search_fft * template_fft, s=search.shape)[:sh - th + 1, :sw - tw + 1]
+        
+        # Window sums of the image and its square from the integral images
+        total, squares = self._search_integrals
+        win_sum = total[th:, tw:] - total[:-th, tw:] - total[th:, :-tw] + total[:-th, :-tw]
+        win_sq = squares[th:, tw:] - squares[:-th, tw:] - squares[th:, :-tw] + squares[:-th, :-tw]
+        variance = np.maximum(win_sq - win_sum * win_sum / (th * tw), 0.0)
+        
+        denom = np.sqrt(variance) * template_norm
+        scores = np.divide(corr, denom, out=np.zeros_like(corr), where=denom > 1e-6)
+        
+        y, x = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        return float(scores[y, x]), (int(x), int(y))
+    
+    def _match_all_templates(self, search: np.ndarray,
+                             search_small: Optional[np.ndarray]) -> List[Tuple[float, Tuple[int, int]]]:
+        """Match every cached template against the search region
+        
+        The template that matched on the previous call is tried first, and
+        the rest are skipped if it scores above both early_exit_threshold and
+        match_threshold. Otherwise the remaining templates are matched in
+        parallel threads on the CPU, since OpenCV releases the GIL inside
+        matchTemplate.
+        
+        Args:
+            search: Grayscale region to search in
+            search_small: Optional downsampled search region for coarse-to-fine matching
+            
+        Returns:
+            List of (confidence, (x, y)) in template order; skipped templates score -1
+        """
+        count = len(self._templates_gray)
+        scores = [(-1.0, (0, 0))] * count
+        remaining = list(range(count))
+        
+        first = self._last_template
+        if first is not None and count > 1:
+            scores[first] = self._match_template(search, first, search_small)
+            if scores[first][0] > max(self.early_exit_threshold, self.match_threshold):
+                return scores
+            remaining.remove(first)
+        
+        # The CUDA path shares GPU buffers between templates, so keep it serial
+        if self.use_cuda or len(remaining) < 2:
+            for i in remaining:
+                scores[i] = self._match_template(search, i, search_small)
+        else:
+            futures = [(i, self._match_pool.submit(self._match_template, search, i, search_small))
+                       for i in remaining]
+            for i, future in futures:
+                scores[i] = future.result()
+        
+        if count:
+            best = max(range(count), key=lambda i: scores[i][0])
+            self._last_template = best if scores[best][0] > self.match_threshold else None
+        return scores
+    
+    def _match_scores(self, search: np.ndarray, template: np.ndarray,
+                      buffer_key: Optional[tuple] = None) -> np.ndarray:
+        """Run template matching and return a score map where higher is better
+        
+        Args:
+            search: Grayscale region to search in
+            template: Grayscale template
+            buffer_key: If given, write into the persistent result buffer for this key
+            
+        Returns:
+            float32 score map
+        """
+        # Inputs stay 8-bit: matchTemplate only has CV_8U and CV_32F kernels
+        # (there is no int8 variant) and the 8-bit ones are the fastest
+        result = None
+        if buffer_key is not None:
+            shape = (search.shape[0] - template.shape[0] + 1,
+                     search.shape[1] - template.shape[1] + 1)
+            result = self._buffer(buffer_key, shape, np.float32)
+        result = cv2.matchTemplate(search, template, self.match_method, result=result)
+        if self.match_method == cv2.TM_SQDIFF_NORMED:
+            np.subtract(1.0, result, out=result)
+        return result
+    
+    def _binarize(self, image: np.ndarray) -> np.ndarray:
+        """Binarize a grayscale image with Otsu's threshold
+        
+        Args:
+            image: Grayscale image
+            
+        Returns:
+            Binary image with values 0 and 255
+        """
+        _, binary = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        return binary
+    
+    def _get_gray(self, image: np.ndarray) -> np.ndarray:
+        """Get the grayscale version of a frame, converting at most once per frame
+        
+        Frames must not be modified in place between detector calls, since
+        the cached conversion is looked up by array identity.
+        
+        Args:
+            image: BGR or BGRA screenshot, or an already grayscale image
+            
+        Returns:
+            Grayscale image
+        """
+        if image.ndim == 2:
+            return image
+        
+        if self._gray_cache is not None and self._gray_cache[0] is image:
+            return self._gray_cache[1]
+        
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        gray = self._buffer('gray', image.shape[:2], np.uint8)
+        cv2.cvtColor(image, code, dst=gray)
+        self._gray_cache = (image, gray)
+        return gray
+    
+    def _get_gray_region(self, image: np.ndarray, y0: int, x0: int) -> np.ndarray:
+        """Get the grayscale version of image[y0:, x0:], converting only that region
+        
+        A whole-frame conversion already cached for this frame is reused.
+        
+        Args:
+            image: BGR or BGRA screenshot, or an already grayscale image
+            y0: First row of the region
+            x0: First column of the region
+            
+        Returns:
+            Grayscale image of the region
+        """
+        if image.ndim == 2:
+            return image[y0:, x0:]
+        
+        if self._gray_cache is not None and self._gray_cache[0] is image:
+            return self._gray_cache[1][y0:, x0:]
+        
+        region = image[y0:, x0:]
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        gray = self._buffer('gray_region', region.shape[:2], np.uint8)
+        cv2.cvtColor(region, code, dst=gray)
+        return gray
+    
+    def _half_size(self, image: np.ndarray, buffer_key=None) -> np.ndarray:
+        """Downsample an image by exactly 2x with INTER_AREA
+        
+        Each output pixel is the mean of a 2x2 block, which is cheaper than
+        pyrDown's 5x5 Gaussian and keeps coordinates an exact factor of 2
+        from the full-size image.
+        
+        Args:
+            image: Grayscale image
+            buffer_key: If given, write into the persistent buffer for this key
+            
+        Returns:
+            Image of half the width and height (rounded down)
+        """
+        h, w = max(1, image.shape[0] // 2), max(1, image.shape[1] // 2)
+        dst = self._buffer(buffer_key, (h, w), np.uint8) if buffer_key is not None else None
+        return cv2.resize(image, (w, h), dst=dst, interpolation=cv2.INTER_AREA)
+    
+    def _buffer(self, key, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        """Get a persistent buffer, reallocating only when its shape changes
+        
+        Args:
+            key: Name of the buffer
+            shape: Required shape
+            dtype: Required dtype
+            
+        Returns:
+            Buffer of the requested shape and dtype; contents are undefined
+        """
+        buf = self._buffers.get(key)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[key] = buf
+        return buf
+    
+    def _to_bgr(self, image: np.ndarray) -> np.ndarray:
+        """Get a BGR copy of an image for drawing debug overlays
+        
+        Args:
+            image: BGR, BGRA or grayscale image
+            
+        Returns:
+            BGR image that is safe to draw on
+        """
+        if image.ndim == 2:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        if image.shape[2] == 4:
+            return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+        return image.copy()
     
     def _ensure_debug_dir(self):
         """Ensure debug screenshots directory exists"""
@@ -52,55 +542,147 @@ class InputDetector:
             return
             
         filepath = os.path.join(self.debug_dir, f"{name}.png")
-        cv2.imwrite(filepath, image)
-        print(f"Saved debug image: {name}.png")
+        # Copy since callers keep drawing on their debug images
+        image = image.copy()
+        with self._debug_lock:
+            drain_scheduled = bool(self._debug_pending)
+            self._debug_pending[filepath] = image
+        if not drain_scheduled:
+            self._io_pool.submit(self._write_debug_images)
+        logger.debug("Saving debug image: %s.png", name)
+    
+    def _write_debug_images(self):
+        """Write pending debug images until none are left (runs on the I/O thread)"""
+        while True:
+            with self._debug_lock:
+                if not self._debug_pending:
+                    return
+                filepath, image = self._debug_pending.popitem()
+            cv2.imwrite(filepath, image)
+    
+    def _ocr_words(self, image: np.ndarray) -> Dict[str, np.ndarray]:
+        """Run a single OCR pass and return the recognized words
+        
+        Args:
+            image: Image to OCR
+            
+        Returns:
+            Dict of parallel arrays: left, top, width, height and text
+        """
+        data = pytesseract.image_to_data(image, output_type=Output.DICT)
+        text = np.array([t.strip() for t in data['text']], dtype=object)
+        keep = text != ''
+        
+        words = {key: np.array(data[key], dtype=np.int32)[keep]
+                 for key in ('left', 'top', 'width', 'height')}
+        words['text'] = text[keep]
+        return words
+    
+    def _words_in_rect(self, words: Dict[str, np.ndarray], x: int, y: int, w: int, h: int) -> str:
+        """Join the OCR words that lie entirely inside a rectangle
+        
+        Args:
+            words: Words as returned by _ocr_words
+            x, y, w, h: Rectangle to collect words from
+            
+        Returns:
+            Words inside the rectangle separated by spaces
+        """
+        mask = ((words['left'] >= x) & (words['top'] >= y) &
+                (words['left'] + words['width'] <= x + w) &
+                (words['top'] + words['height'] <= y + h))
+        return ' '.join(words['text'][mask])
+    
+    def _merge_candidates(self, rects: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        """Merge overlapping candidate rectangles and keep the largest ones
+        
+        Rectangles are taken largest first, and one is dropped if more than half
+        of it overlaps a rectangle already kept (this covers nested boxes too).
+        
+        Args:
+            rects: Candidate rectangles as (x, y, w, h)
+            
+        Returns:
+            At most max_ocr_candidates rectangles, largest first
+        """
+        if not rects:
+            return []
+        
+        boxes = np.array(rects, dtype=np.int64)
+        x0, y0 = boxes[:, 0], boxes[:, 1]
+        x1, y1 = x0 + boxes[:, 2], y0 + boxes[:, 3]
+        areas = boxes[:, 2] * boxes[:, 3]
+        
+        kept: List[int] = []
+        for i in np.argsort(-areas, kind='stable'):
+            if kept:
+                k = np.array(kept)
+                overlap_w = np.clip(np.minimum(x1[i], x1[k]) - np.maximum(x0[i], x0[k]), 0, None)
+                overlap_h = np.clip(np.minimum(y1[i], y1[k]) - np.maximum(y0[i], y0[k]), 0, None)
+                if np.any(overlap_w * overlap_h * 2 > areas[i]):
+                    continue
+            kept.append(i)
+            if len(kept) == self.max_ocr_candidates:
+                break
+        return [tuple(int(v) for v in boxes[i]) for i in kept]
     
     def find_input_box_by_placeholder(self, image: np.ndarray) -> Optional[InputBox]:
         """Find the input box containing placeholder text
         
         Args:
-            image: Screenshot to search in
+            image: Screenshot to search in (BGR, BGRA or grayscale)
             
         Returns:
             InputBox if found, None otherwise
         """
         try:
-            # Blur image to reduce noise
-            blurred = cv2.GaussianBlur(image, (5, 5), 0)
-            self._save_debug_image(blurred, 'blurred_input')
+            # Convert to grayscale (shared with the other detectors)
+            gray = self._get_gray(image)
             
-            # Convert to grayscale
-            gray = cv2.cvtColor(blurred, cv2.COLOR_BGR2GRAY)
-            
-            # Threshold
-            _, thresh = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV)
+            # Threshold with Otsu's method; UI chrome is clean enough to skip blurring
+            _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+            self._save_debug_image(thresh, 'threshold_input')
             
-            # Find contours
-            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            # Label connected regions; stats rows are (x, y, w, h, area)
+            _, _, stats, _ = cv2.connectedComponentsWithStats(thresh, connectivity=8)
+            stats = stats[1:]  # Skip the background label
+            widths = stats[:, cv2.CC_STAT_WIDTH]
+            heights = stats[:, cv2.CC_STAT_HEIGHT]
+            areas = stats[:, cv2.CC_STAT_AREA]
             
             # Find rectangles that could be input boxes
             potential_inputs = []
-            debug_img = image.copy()
             
-            for cnt in contours:
-                x, y, w, h = cv2.boundingRect(cnt)
+            # Input box should be wider than tall (aspect ratio > 3)
+            keep = (widths > 3*heights) & (widths > 100)
+            
+            # Solid blocks have no placeholder text to read
+            keep &= areas <= self.max_pixel_fill * widths * heights
+            
+            candidates = [tuple(int(v) for v in r) for r in stats[keep, :4]]
+            
+            candidates = self._merge_candidates(candidates)
+            
+            # OCR the whole image once instead of once per candidate
+            words = self._ocr_words(image) if candidates else None
+            
+            for x, y, w, h in candidates:
+                text = self._words_in_rect(words, x, y, w, h)
                 
-                # Input box should be wider than tall (aspect ratio > 3)
-                if w > 3*h and w > 100:
-                    # Extract ROI and OCR
-                    roi = image[y:y+h, x:x+w]
-                    text = pytesseract.image_to_string(roi).strip()
-                    
-                    if text:
-                        print(f"Found input box with placeholder text: {text}")
-                        potential_inputs.append((x, y, w, h, text))
-                        
-                        # Draw on debug image
+                if text:
+                    logger.debug("Found input box with placeholder text: %s", text)
+                    potential_inputs.append((x, y, w, h, text))
+            
+            if potential_inputs:
+                if self.debug:
+                    debug_img = self._to_bgr(image)
+                    for x, y, w, h, text in potential_inputs:
                         cv2.rectangle(debug_img, (x, y), (x+w, y+h), (0, 255, 0), 2)
                         cv2.putText(debug_img, text, (x, y-5),
                                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-            
-            if potential_inputs:
+                    self._save_debug_image(debug_img, 'detected_input')
+                
+
                 # Select the input box with the longest text
                 potential_inputs.sort(key=lambda x: len(x[4]), reverse=True)
                 x, y, w, h, text = potential_inputs[0]
@@ -109,8 +691,7 @@ class InputDetector:
                 click_x = x + w//2
                 click_y = y + h//2
                 
-                self._save_debug_image(debug_img, 'detected_input')
-                print(f"Selected input box with text: {text}")
+                logger.debug("Selected input box with text: %s", text)
                 
                 return InputBox(
                     x=x,
@@ -123,7 +704,7 @@ class InputDetector:
                 )
                 
         except Exception as e:
-            print(f"Error finding input box: {e}")
+            logger.error("Error finding input box: %s", e)
         
         return None
     
@@ -131,7 +712,7 @@ class InputDetector:
         """Find arrow icon in image
         
         Args:
-            image: Image to search in
+            image: Image to search in (BGR, BGRA or grayscale)
             is_up_arrow: True to look for up arrow, False for down arrow
             
         Returns:
@@ -139,7 +720,19 @@ class InputDetector:
         """
         try:
             # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            gray = self._get_gray(image)
+            
+            # Match the icon template directly when one is available
+            template = self._arrow_templates.get(is_up_arrow)
+            if template is not None:
+                h, w = template.shape
+                result = self._buffer(('arrow', is_up_arrow),
+                                      (gray.shape[0] - h + 1, gray.shape[1] - w + 1), np.float32)
+                cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED, result=result)
+                _, max_val, _, (x, y) = cv2.minMaxLoc(result)
+                if max_val > self.arrow_threshold:
+                    return (x + w//2, y + h//2)
+                return None
             
             # Threshold
             _, thresh = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV)
@@ -147,20 +740,25 @@ class InputDetector:
             # Find contours
             contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
-            for cnt in contours:
-                # Get bounding box
-                x, y, w, h = cv2.boundingRect(cnt)
+            # Bounding boxes of all contours as one (N, 4) array
+            rects = np.array([cv2.boundingRect(c) for c in contours], dtype=np.int32).reshape(-1, 4)
+            widths, heights = rects[:, 2], rects[:, 3]
+            
+            # Arrow should be roughly square
+            square = (widths > 10) & (widths > 0.8*heights) & (widths < 1.2*heights)
+            
+            hits = np.flatnonzero(square)
+            if hits.size:
+                x, y, w, h = (int(v) for v in rects[hits[0]])
                 
-                # Arrow should be roughly square
-                if 0.8 < w/h < 1.2 and w > 10:
-                    # Get center point
-                    center_x = x + w//2
-                    center_y = y + h//2
-                    
-                    return (center_x, center_y)
+                # Get center point
+                center_x = x + w//2
+                center_y = y + h//2
+                
+                return (center_x, center_y)
             
         except Exception as e:
-            print(f"Error finding arrow icon: {e}")
+            logger.error("Error finding arrow icon: %s", e)
         
         return None
     
@@ -168,7 +766,7 @@ class InputDetector:
         """Find Cascade's input box in the screenshot using template matching
         
         Args:
-            image: Screenshot of the window
+            image: Screenshot of the window (BGR, BGRA or grayscale)
             
         Returns:
             InputBox object if found, None otherwise
@@ -176,99 +774,208 @@ class InputDetector:
         try:
             height, width = image.shape[:2]
             
-            # Load template images
-            template1 = cv2.imread('screenshots/input.png')
-            template2 = cv2.imread('screenshots/input_new.png')
-            
-            # Convert all to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            template1_gray = cv2.cvtColor(template1, cv2.COLOR_BGR2GRAY)
-            template2_gray = cv2.cvtColor(template2, cv2.COLOR_BGR2GRAY)
+            if not self._templates_gray:
+                logger.error("No input box templates loaded")
+                return None
             
             if self.debug:
-                self._save_debug_image(gray, "1_grayscale.png")
+                self._save_debug_image(self._get_gray(image), "1_grayscale.png")
             
-            # Only search in right half of image
-            right_half = gray[:, width//2:]
+            # Only search in the lower band of the right half of the image,
+            # keeping the band at least as tall as the largest template
+            max_template_h = max(t.shape[0] for t in self._templates_gray)
+            top = min(int(height * self.search_top_frac), max(0, height - max_template_h))
+            
+            # Convert just that band to grayscale (templates are cached in grayscale)
+            right_half = self._get_gray_region(image, top, width//2)
+            if self.binarize:
+                right_half = self._binarize(right_half)
+            
+            # Upload the search region once for all templates
+            if self.use_cuda:
+                self._upload_search_image(right_half)
+            
+            # Transform once for every template matched in the frequency domain
+            fft_indices = [i for i in range(len(self._templates_gray)) if self._use_fft_for(i)]
+            if fft_indices:
+                self._prepare_fft(right_half)
+            
+            # Downsample once for the coarse pass of every template
+            right_half_small = None
+            if self.use_pyramid and not self.use_cuda and len(fft_indices) < len(self._templates_gray):
+                right_half_small = self._half_size(right_half, 'search_small')
             
             # Try matching both templates
-            matches = []
-            for i, template in enumerate([template1_gray, template2_gray]):
-                # Match template
-                result = cv2.matchTemplate(right_half, template, cv2.TM_CCOEFF_NORMED)
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+            scores = self._match_all_templates(right_half, right_half_small)
+            
+            # Matches are stored as parallel arrays, one slot per template
+            n = 0
+            for i, template in enumerate(self._templates_gray):
+                max_val, max_loc = scores[i]
                 
                 # If good match found
-                if max_val > 0.6:  # Adjust threshold as needed
+                if max_val > self.match_threshold:
                     x = max_loc[0]
                     y = max_loc[1]
                     w = template.shape[1]
                     h = template.shape[0]
                     
-                    matches.append({
-                        'x': x + width//2,  # Adjust for right half
-                        'y': y,
-                        'width': w,
-                        'height': h,
-                        'confidence': max_val,
-                        'template_idx': i
-                    })
+                    self._match_x[n] = x + width//2  # Adjust for right half
+                    self._match_y[n] = y + top  # Adjust for search band
+                    self._match_w[n] = w
+                    self._match_h[n] = h
+                    self._match_conf[n] = max_val
+                    n += 1
                     
-                    if self.debug:
-                        print(f"Found match with template {i}:")
-                        print(f"Position: ({x + width//2}, {y})")
-                        print(f"Size: {w}x{h}")
-                        print(f"Confidence: {max_val:.3f}")
+                    logger.debug("Found match with template %d: position (%d, %d), size %dx%d, "
+                                 "confidence %.3f", i, x + width//2, y + top, w, h, max_val)
             
-            if not matches:
-                if self.debug:
-                    print("No input box matches found")
+            if n == 0:
+                logger.debug("No input box matches found")
                 return None
                 
             # Use best match
-            best_match = max(matches, key=lambda m: m['confidence'])
+            best = int(np.argmax(self._match_conf[:n]))
+            x = int(self._match_x[best])
+            y = int(self._match_y[best])
+            w = int(self._match_w[best])
+            h = int(self._match_h[best])
+            confidence = float(self._match_conf[best])
             
             # Calculate click position
-            click_x = best_match['x'] + best_match['width']//2
-            click_y = best_match['y'] + best_match['height']//2
+            click_x = x + w//2
+            click_y = y + h//2
             
             if self.debug:
                 # Draw debug visualization
-                debug_img = image.copy()
-                cv2.rectangle(debug_img,
-                            (best_match['x'], best_match['y']),
-                            (best_match['x'] + best_match['width'],
-                             best_match['y'] + best_match['height']),
-                            (0, 255, 0), 2)
+                debug_img = self._to_bgr(image)
+                cv2.rectangle(debug_img, (x, y), (x + w, y + h), (0, 255, 0), 2)
                 cv2.circle(debug_img, (click_x, click_y), 5, (255, 0, 0), -1)
                 self._save_debug_image(debug_img, "2_detection.png")
             
             return InputBox(
-                x=best_match['x'],
-                y=best_match['y'],
-                width=best_match['width'],
-                height=best_match['height'],
-                confidence=best_match['confidence'],
+                x=x,
+                y=y,
+                width=w,
+                height=h,
+                confidence=confidence,
                 text="input_box",
                 click_position=(click_x, click_y)
             )
             
         except Exception as e:
-            print(f"Error finding input box: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error finding input box: %s", e)
             return None
 
     def get_active_window_info(self):
         """Get the active window's info"""
         return pyautogui.getActiveWindow()
 
-    def capture_window_screenshot(self, window_info):
-        """Capture a screenshot of the given window"""
-        return pyautogui.screenshot(region=window_info.box)
+    def capture_window_screenshot(self, window_info) -> np.ndarray:
+        """Capture a screenshot of the given window
+        
+        Args:
+            window_info: Window to capture
+            
+        Returns:
+            BGRA image backed by the raw capture buffer
+        """
+        # mss instances are not thread-safe, so keep one per thread
+        sct = getattr(self._capture_local, 'sct', None)
+        if sct is None:
+            sct = self._capture_local.sct = mss.mss()
+        
+        left, top, width, height = window_info.box
+        raw = sct.grab({'left': left, 'top': top, 'width': width, 'height': height})
+        return np.asarray(raw)
+    
+    def start_capture(self, window_info):
+        """Start capturing grayscale screenshots on a background thread
+        
+        Capture overlaps with detection; get_frame() always returns the
+        newest frame and older unconsumed frames are dropped.
+        
+        Args:
+            window_info: Window to capture
+        """
+        self.stop_capture()
+        self._frame_q = queue.Queue(maxsize=1)
+        self._capture_stop = threading.Event()
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop, args=(window_info,), daemon=True)
+        self._capture_thread.start()
+    
+    def _capture_loop(self, window_info):
+        """Producer loop for start_capture()"""
+        while not self._capture_stop.is_set():
+            try:
+                screenshot = self.capture_window_screenshot(window_info)
+                frame = cv2.cvtColor(screenshot, cv2.COLOR_BGRA2GRAY)
+            except Exception as e:
+                logger.error("Error capturing screenshot: %s", e)
+                self._capture_stop.wait(0.5)
+                continue
+            
+            # Replace any frame the consumer has not picked up yet
+            try:
+                self._frame_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._frame_q.put(frame)
+    
+    def get_frame(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Get the newest frame from the capture thread
+        
+        Args:
+            timeout: Seconds to wait for a frame, None to wait forever
+            
+        Returns:
+            Grayscale frame, or None if no frame arrived in time
+        """
+        try:
+            return self._frame_q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def stop_capture(self):
+        """Stop the capture thread started by start_capture()"""
+        thread = getattr(self, '_capture_thread', None)
+        if thread is None:
+            return
+        self._capture_stop.set()
+        thread.join()
+        self._capture_thread = None
+
+def print_input_box(input_box: Optional[InputBox]):
+    """Print a detection result"""
+    if input_box:
+        print("\nDetected Input Box:")
+        print(f"Position: ({input_box.x}, {input_box.y})")
+        print(f"Size: {input_box.width}x{input_box.height}")
+        print(f"Text: '{input_box.text}' (Confidence: {input_box.confidence:.0f}%)")
+        print(f"Click Position: {input_box.click_position}")
+    else:
+        print("\nNo input box detected")
+
+def watch(detector: InputDetector, window_info):
+    """Detect continuously, capturing the next frame while detecting the current one"""
+    detector.start_capture(window_info)
+    print("Watching for input box, press Ctrl+C to stop")
+    try:
+        while True:
+            frame = detector.get_frame(timeout=1.0)
+            if frame is None:
+                continue
+            print_input_box(detector.find_input_box(frame))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.stop_capture()
 
 def main():
     """Test the input detection"""
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s')
+    
     # Initialize detector with debug mode
     detector = InputDetector(debug=True)
     
@@ -278,25 +985,17 @@ def main():
         print("Could not get window info")
         return
     
-    screenshot = detector.capture_window_screenshot(window_info)
-    if screenshot is None:
-        print("Failed to capture screenshot")
+    if '--watch' in sys.argv[1:]:
+        watch(detector, window_info)
         return
     
-    # Convert screenshot to OpenCV image
-    frame = np.array(screenshot)
-    frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+    frame = detector.capture_window_screenshot(window_info)
+    if frame is None:
+        print("Failed to capture screenshot")
+        return
     
-    # Find input box
-    input_box = detector.find_input_box(frame)
-    if input_box:
-        print("\nDetected Input Box:")
-        print(f"Position: ({input_box.x}, {input_box.y})")
-        print(f"Size: {input_box.width}x{input_box.height}")
-        print(f"Text: '{input_box.text}' (Confidence: {input_box.confidence:.0f}%)")
-        print(f"Click Position: {input_box.click_position}")
-    else:
-        print("\nNo input box detected")
+    # Find input box (the BGRA frame is converted to grayscale once)
+    print_input_box(detector.find_input_box(frame))
 
 if __name__ == "__main__":
     main()
@@ -1,25 +1,74 @@
 #!/usr/bin/env python3
+import logging
+import hashlib
+import re
+import signal
 import pyautogui
 import subprocess
 import time
 import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
 from PIL import Image
 import pytesseract
 import os
 import cv2
 import numpy as np
+import mss
+from mss.exception import ScreenShotError
 import pyperclip
 from dotenv import load_dotenv
 from input_detection import InputDetector
 
+try:
+    # Real locks on Display, which is also used from the capture worker
+    import Xlib.threaded
+    from Xlib import X
+    from Xlib import display as xdisplay
+    from Xlib.error import XError
+    from Xlib.protocol import event as xevent
+except ImportError:  # python-xlib is optional; wmctrl/xdotool are used without it
+    xdisplay = None
+
+try:
+    from tesserocr import PyTessBaseAPI, PSM, RIL, iterate_level
+except ImportError:  # tesserocr is optional; pytesseract is used without it
+    PyTessBaseAPI = None
+
 # Load environment variables
 load_dotenv()
 
+# Position and size in `xdotool getwindowgeometry` output
+_GEOM_RE = re.compile(r'Position:\s+(\d+),(\d+).*?Geometry:\s+(\d+)x(\d+)', re.DOTALL)
+
 # Safety pause between actions
 pyautogui.PAUSE = 0.5
 # Fail-safe: move mouse to upper-left corner to stop
 pyautogui.FAILSAFE = True
 
+@contextmanager
+def _nopause(pause=0.02):
+    """Shorten the pause after each PyAutoGUI call for input into a focused window"""
+    saved = pyautogui.PAUSE
+    pyautogui.PAUSE = pause
+    try:
+        yield
+    finally:
+        pyautogui.PAUSE = saved
+
+@dataclass
+class FocusLock:
+    """Window that focus is kept on while the lock is enabled"""
+    enabled: bool = False
+    window_id: Optional[int] = None
+    window_type: Optional[str] = None
+    last_check: float = 0.0  # time.monotonic() of the last focus check
+
 class WindowController:
     def __init__(self):
         """Initialize window controller"""
@@ -42,6 +91,13 @@ class WindowController:
         self.terminal_titles = ["Terminal", "ubuntu@"]
         self.browser_titles = ["Chrome", "Firefox"]
         
+        # One case-insensitive pattern per window type, checked in this order
+        self._title_patterns = tuple(
+            (window_type, re.compile('|'.join(map(re.escape, titles)), re.IGNORECASE))
+            for window_type, titles in (('windsurf', self.windsurf_titles),
+                                        ('terminal', self.terminal_titles),
+                                        ('browser', self.browser_titles)))
+        
         # Window IDs
         self.windows = {
             'windsurf': None,
@@ -50,55 +106,303 @@ class WindowController:
         }
         
         # Focus lock for window switching
-        self.focus_lock = {
-            'enabled': False,
-            'window_id': None,
-            'window_type': None,
-            'last_check': 0
-        }
+        self.focus_lock = FocusLock()
         
         # Timing configurations
-        self.window_switch_delay = 1.0
+        self.window_switch_delay = 1.0  # Longest wait for a window to become active
         self.action_delay = 0.3
         self.command_delay = 1.5
-        self.focus_check_interval = 0.5  # How often to check focus
+        self.command_timeout = 300.0  # Longest the test command may run
+        self.focus_check_interval = 1.0  # How often to check focus
         
         # Configure PyAutoGUI
         pyautogui.FAILSAFE = True  # Move mouse to upper-left corner to abort
-        pyautogui.PAUSE = 0.1  # Add small delay between PyAutoGUI commands
         
         # Initialize input detector
         self.input_detector = InputDetector(debug=True)
         
+        # Screen grabbers (one per capturing thread) and cached window geometry
+        self._capture_local = threading.local()
+        self._window_geometry = {}
+        
+        # Results for identical frames, keyed by SHA256 of the pixels (LRU)
+        self.cache_size = 64
+        self._ocr_cache = OrderedDict()
+        self._input_cache = OrderedDict()
+        
+        # Tesseract settings for button labels: sparse text (no page layout
+        # analysis) and only the letters of the labels we look for
+        self.ocr_labels = ('Approve', 'Run')
+        self.ocr_whitelist = 'ApproveRunapprovun'
+        self.ocr_config = f'--psm 11 -c tessedit_char_whitelist={self.ocr_whitelist}'
+        self.ocr_max_height = 1000  # Taller images are halved before OCR
+        
+        # In-process Tesseract that keeps its model loaded between calls
+        self._tess = self._open_tesseract()
+        
+        # Area of the window holding the approval buttons, as (x0, y0, x1, y1)
+        # fractions of the window size
+        self.approval_roi_frac = (0.55, 0.80, 1.0, 1.0)
+        
+        # Grayscale button templates matched before falling back to OCR
+        self.approval_threshold = 0.85
+        self._approval_templates = self._load_approval_templates({
+            'Approve': 'approve_btn.png',
+            'Run': 'run_btn.png',
+        })
+        
+        # Thumbnail of the previous approval-check frame and its OCR text
+        self.diff_size = (160, 90)
+        self.diff_threshold = 8
+        self._prev_small = None
+        self._prev_frame_shape = None
+        self._last_approval_words = ()
+        
+        # Captures the next approval-check frame while the current one is checked
+        self._capture_pool = ThreadPoolExecutor(max_workers=1)
+        
+        # Persistent X connection for window queries (None: use wmctrl/xdotool)
+        self._display = self._open_display()
+        
+        # Set by a background xprop watcher whenever the window list changes
+        # (None: no watcher, the list is fetched on every update)
+        self._window_watch = None
+        self._windows_changed = self._start_window_watch()
+        
         # Initialize window positions
         self.update_window_positions()
         
         self.debug = True
 
-    def _normalize_window_id(self, window_id):
-        """Normalize window ID to decimal format"""
+    def _parse_window_id(self, window_id):
+        """Parse a window ID from wmctrl (hex 0x...) or xdotool (decimal) output
+        
+        Window IDs are kept as ints everywhere else and only turned back into
+        strings for subprocess arguments.
+        
+        Returns:
+            int window ID, or None if it can't be parsed
+        """
+        try:
+            if window_id.startswith('0x'):
+                return int(window_id, 16)
+            return int(window_id)
+        except ValueError as e:
+            print(f"Error parsing window ID: {e}")
+            return None
+
+    def close(self):
+        """Release the Tesseract model, xprop watcher, worker thread and X connections"""
+        if self._tess is not None:
+            self._tess.End()
+            self._tess = None
+        if self._window_watch is not None:
+            self._window_watch.terminate()
+            self._window_watch.wait()
+            self._window_watch = None
+            self._windows_changed = None
+        # Each mss instance can only be closed on the thread that created it
+        self._capture_pool.submit(self._close_grabber).result()
+        self._capture_pool.shutdown()
+        self._close_grabber()
+        if self._display is not None:
+            self._display.close()
+            self._display = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open_display(self):
+        """Open a persistent X display connection if python-xlib is available"""
+        if xdisplay is None:
+            return None
         try:
-            # Convert from hex (0x...) to decimal
-            if isinstance(window_id, str) and window_id.startswith('0x'):
-                return str(int(window_id, 16))
-            return str(window_id)
+            display = xdisplay.Display()
+            self._root = display.screen().root
+            self._atoms = {name: display.intern_atom(name) for name in (
+                '_NET_ACTIVE_WINDOW', '_NET_CLIENT_LIST', '_NET_WM_NAME', '_NET_WM_STATE',
+                '_NET_WM_STATE_HIDDEN', '_NET_WM_STATE_SHADED', 'UTF8_STRING')}
+            return display
         except Exception as e:
-            print(f"Error normalizing window ID: {e}")
-            return str(window_id)
+            print(f"Could not open X display, using wmctrl/xdotool: {e}")
+            return None
+
+    def _start_window_watch(self):
+        """Watch the root window's client list with a long-lived xprop -spy
+        
+        Only windows opening and closing are seen: a window changing its title
+        (_NET_WM_NAME is set on each client, not on the root) doesn't change the
+        list, so a retitled window keeps its old window type until
+        update_window_positions(force=True).
+        
+        Returns:
+            threading.Event set whenever the window list changes, or None if
+            xprop can't be started
+        """
+        try:
+            self._window_watch = subprocess.Popen(
+                ['xprop', '-spy', '-root', '_NET_CLIENT_LIST'],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except OSError as e:
+            print(f"Could not start xprop, window list will be polled: {e}")
+            return None
+        
+        changed = threading.Event()
+        changed.set()
+        
+        def watch():
+            last = None
+            for line in self._window_watch.stdout:
+                if line != last:
+                    last = line
+                    changed.set()
+            # xprop exited; update_window_positions falls back to polling
+            changed.set()
+        
+        threading.Thread(target=watch, daemon=True).start()
+        return changed
+
+    def _window_list_current(self):
+        """Check whether the window list is unchanged since the last update"""
+        return (self._windows_changed is not None
+                and self._window_watch.poll() is None
+                and not self._windows_changed.is_set())
+
+    def _get_active_window_id(self):
+        """Get the active window ID as an int, or None"""
+        if self._display is not None:
+            try:
+                prop = self._root.get_full_property(self._atoms['_NET_ACTIVE_WINDOW'], X.AnyPropertyType)
+                if prop and len(prop.value):
+                    return int(prop.value[0])
+                return None
+            except XError as e:
+                print(f"Error reading active window: {e}")
+                return None
+        
+        result = subprocess.run(['xdotool', 'getactivewindow'], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        return self._parse_window_id(result.stdout.strip())
+
+    def _list_windows(self):
+        """List top-level windows as (window_id, title) pairs
+        
+        Window IDs are ints. Returns None on failure.
+        """
+        if self._display is not None:
+            try:
+                prop = self._root.get_full_property(self._atoms['_NET_CLIENT_LIST'], X.AnyPropertyType)
+                windows = []
+                for wid in (prop.value if prop else []):
+                    try:
+                        windows.append((int(wid), self._get_window_title(wid)))
+                    except XError:
+                        continue  # Window closed while listing
+                return windows
+            except XError as e:
+                print(f"Error reading window list: {e}")
+                return None
+        
+        # Parsed as bytes, so only the titles are decoded
+        result = subprocess.run(['wmctrl', '-l'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        if result.returncode != 0:
+            return None
+        windows = []
+        for line in result.stdout.splitlines():
+            # Columns: window ID, desktop, host, title
+            window_id, _, rest = line.partition(b' ')
+            _, _, rest = rest.lstrip().partition(b' ')
+            _, _, title = rest.lstrip().partition(b' ')
+            title = title.lstrip()
+            if not title:
+                continue
+            try:
+                windows.append((int(window_id, 16), title.decode('utf-8', 'replace')))
+            except ValueError:
+                continue
+        return windows
+
+    def _get_window_title(self, wid):
+        """Get a window's title over the X connection"""
+        window = self._display.create_resource_object('window', wid)
+        prop = window.get_full_property(self._atoms['_NET_WM_NAME'], self._atoms['UTF8_STRING'])
+        if prop and prop.value:
+            value = prop.value
+            return value.decode('utf-8', 'replace') if isinstance(value, bytes) else str(value)
+        return window.get_wm_name() or ''
+
+    def _send_client_message(self, wid, message_type, data):
+        """Send an EWMH client message for a window to the window manager"""
+        window = self._display.create_resource_object('window', wid)
+        event = xevent.ClientMessage(window=window, client_type=self._atoms[message_type],
+                                     data=(32, data))
+        self._root.send_event(event, event_mask=X.SubstructureRedirectMask | X.SubstructureNotifyMask)
+        self._display.flush()
+
+    def _unminimize_window(self, window_id):
+        """Remove the hidden and shaded states from a window over the X connection
+        
+        Without Xlib, _activate_window does this with wmctrl in its shell script.
+        """
+        try:
+            # Action 0 removes the listed states
+            self._send_client_message(window_id, '_NET_WM_STATE', [
+                0, self._atoms['_NET_WM_STATE_HIDDEN'], self._atoms['_NET_WM_STATE_SHADED'], 1, 0])
+            return True
+        except XError as e:
+            print(f"Error restoring window: {e}")
+            return False
+
+    def _activate_window(self, window_id, unminimize=False):
+        """Ask the window manager to activate a window
+        
+        Args:
+            window_id: X window ID
+            unminimize: Also remove the hidden and shaded states first
+            
+        Returns:
+            bool: True if the request was sent, False if the window is gone or the request failed
+        """
+        if self._display is not None:
+            if unminimize:
+                self._unminimize_window(window_id)
+            try:
+                window = self._display.create_resource_object('window', window_id)
+                # Raises BadWindow if the window no longer exists
+                window.get_attributes()
+                # Raise it too, for window managers that activate without raising;
+                # flushed together with the activation request
+                window.configure(stack_mode=X.Above)
+                # Source 2 marks the request as coming from a pager, which window
+                # managers honour even with focus stealing prevention
+                self._send_client_message(window_id, '_NET_ACTIVE_WINDOW', [2, X.CurrentTime, 0, 0, 0])
+                return True
+            except XError as e:
+                print(f"Error activating window: {e}")
+                return False
+        
+        # Use both wmctrl and xdotool for better reliability, in one shell
+        # process; the exit status is wmctrl's
+        script = 'wmctrl -i -a "$1"; rc=$?; xdotool windowactivate "$2"; exit $rc'
+        if unminimize:
+            script = 'wmctrl -i -r "$1" -b remove,hidden,shaded; ' + script
+        return subprocess.call(['sh', '-c', script, 'sh', hex(window_id), str(window_id)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0
 
     def check_terminal_health(self):
         """Check if terminal is healthy and responding"""
         self.update_window_positions()
         
-        if 'terminal' in self.windows:
-            try:
-                # Try to activate terminal window to check if it's responsive
-                result = subprocess.run(['wmctrl', '-i', '-a', self.windows['terminal']], 
-                                     check=True, capture_output=True)
+        if self.windows.get('terminal'):
+            # Try to activate terminal window to check if it's responsive
+            if self._activate_window(self.windows['terminal']):
                 return True
-            except subprocess.CalledProcessError:
-                print("Terminal window not responding")
-                self.windows.pop('terminal', None)
+            print("Terminal window not responding")
+            self.windows.pop('terminal', None)
         else:
             print("No terminal window found")
         return False
@@ -107,53 +411,42 @@ class WindowController:
         """Enable focus lock for a specific window"""
         window_id = self.windows.get(window_type)
         if window_id:
-            self.focus_lock = {
-                'enabled': True,
-                'window_id': window_id,
-                'window_type': window_type,
-                'last_check': time.time()
-            }
+            self.focus_lock.enabled = True
+            self.focus_lock.window_id = window_id
+            self.focus_lock.window_type = window_type
+            self.focus_lock.last_check = time.monotonic()
             print(f"Focus lock enabled for {window_type} window")
             return True
         return False
 
     def disable_focus_lock(self):
         """Disable focus lock"""
-        self.focus_lock = {
-            'enabled': False,
-            'window_id': None,
-            'window_type': None,
-            'last_check': 0
-        }
+        self.focus_lock.enabled = False
+        self.focus_lock.window_id = None
+        self.focus_lock.window_type = None
+        self.focus_lock.last_check = 0.0
         print("Focus lock disabled")
 
     def check_and_restore_focus(self):
         """Check if focus has been lost and restore it if necessary"""
         try:
-            if not self.focus_lock['enabled']:
+            if not self.focus_lock.enabled:
                 return True
                 
             # Only check periodically to avoid too frequent checks
-            current_time = time.time()
-            if current_time - self.focus_lock['last_check'] < self.focus_check_interval:
+            current_time = time.monotonic()
+            if current_time - self.focus_lock.last_check < self.focus_check_interval:
                 return True
                 
-            self.focus_lock['last_check'] = current_time
+            self.focus_lock.last_check = current_time
             
             # Get current active window
-            active_window = subprocess.run(
-                ['xdotool', 'getactivewindow'],
-                capture_output=True,
-                text=True
-            )
-            
-            if active_window.returncode == 0:
-                active_id = self._normalize_window_id(active_window.stdout.strip())
-                locked_id = self._normalize_window_id(self.focus_lock['window_id'])
-                
-                if active_id != locked_id:
-                    print(f"Focus lost from {self.focus_lock['window_type']} window, restoring...")
-                    return self.switch_to_window(self.focus_lock['window_type'])
+            active_id = self._get_active_window_id()
+            
+            if active_id is not None:
+                if active_id != self.focus_lock.window_id:
+                    print(f"Focus lost from {self.focus_lock.window_type} window, restoring...")
+                    return self.switch_to_window(self.focus_lock.window_type)
                     
             return True
             
@@ -168,119 +461,119 @@ class WindowController:
             if not window_id:
                 print(f"No {window_type} window ID found")
                 return False
+            
+            # The window may have moved since the last step; look it up again
+            self._window_geometry.pop(window_id, None)
+            
+            # Nothing to send or wait for if the window already has focus
+            if self._get_active_window_id() == window_id:
+                if window_type == 'windsurf':
+                    self.enable_focus_lock(window_type)
+                return True
                 
             print(f"Switching to {window_type} window (ID: {window_id})")
             
-            # First, make sure window is not minimized
-            subprocess.run(['wmctrl', '-i', '-r', window_id, '-b', 'remove,hidden,shaded'])
-            time.sleep(0.5)  # Wait for unminimize
-            
-            # Then activate it using both wmctrl and xdotool for better reliability
-            subprocess.run(['wmctrl', '-i', '-a', window_id])
-            normalized_id = self._normalize_window_id(window_id)
-            subprocess.run(['xdotool', 'windowactivate', normalized_id])
-            time.sleep(self.window_switch_delay)  # Use configured delay
-            
-            # Verify the switch was successful by checking active window
-            active_window = subprocess.run(
-                ['xdotool', 'getactivewindow'],
-                capture_output=True,
-                text=True
-            )
-            
-            if active_window.returncode == 0:
-                active_id = self._normalize_window_id(active_window.stdout.strip())
-                if active_id == normalized_id:
-                    print(f"Successfully switched to {window_type} window")
-                    # Enable focus lock for windsurf windows
-                    if window_type == 'windsurf':
-                        self.enable_focus_lock(window_type)
-                    return True
+            # Make sure window is not minimized, activate it and wait until the
+            # window manager reports it active
+            self._activate_window(window_id, unminimize=True)
+            if self._wait_for_active(window_id, self.window_switch_delay):
+                print(f"Successfully switched to {window_type} window")
+                # Enable focus lock for windsurf windows
+                if window_type == 'windsurf':
+                    self.enable_focus_lock(window_type)
+                return True
             
-            # If verification failed, try one more time with xdotool
+            # If verification failed, try one more time
             print(f"First switch attempt failed, trying again...")
-            subprocess.run(['xdotool', 'windowactivate', normalized_id])
-            time.sleep(self.window_switch_delay)
-            
-            active_window = subprocess.run(
-                ['xdotool', 'getactivewindow'],
-                capture_output=True,
-                text=True
-            )
-            
-            if active_window.returncode == 0:
-                active_id = self._normalize_window_id(active_window.stdout.strip())
-                if active_id == normalized_id:
-                    print(f"Successfully switched to {window_type} window on second attempt")
-                    # Enable focus lock for windsurf windows
-                    if window_type == 'windsurf':
-                        self.enable_focus_lock(window_type)
-                    return True
+            self._activate_window(window_id)
+            if self._wait_for_active(window_id, self.window_switch_delay):
+                print(f"Successfully switched to {window_type} window on second attempt")
+                # Enable focus lock for windsurf windows
+                if window_type == 'windsurf':
+                    self.enable_focus_lock(window_type)
+                return True
             
             print(f"Failed to switch to {window_type} window after retries")
-            print(f"Expected window ID: {normalized_id}")
-            print(f"Active window ID: {self._normalize_window_id(active_window.stdout.strip()) if active_window.returncode == 0 else 'unknown'}")
+            print(f"Expected window ID: {window_id}")
+            print(f"Active window ID: {self._get_active_window_id() or 'unknown'}")
             return False
             
         except Exception as e:
             print(f"Error switching to {window_type} window: {e}")
             return False
 
-    def update_window_positions(self):
-        """Update stored window positions"""
+    def _wait_for(self, condition, timeout, interval=0.02):
+        """Poll condition until it returns True or timeout seconds pass
+        
+        Returns:
+            bool: True if the condition was met in time
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if condition():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+    def _wait_for_active(self, target_id, timeout=1.0, interval=0.02):
+        """Wait until the window manager reports target_id as the active window"""
+        return self._wait_for(lambda: self._get_active_window_id() == target_id, timeout, interval)
+
+    def update_window_positions(self, force=False):
+        """Update stored window positions
+        
+        The window list is only fetched again if the xprop watcher has seen it
+        change since the last update, or if force is set. Title changes alone
+        are not seen by the watcher, so pass force=True to pick those up.
+        """
+        # Windows may have moved or been resized since the last lookup
+        self._window_geometry.clear()
+        if not force and self._window_list_current():
+            return
+        
+        # Clear before listing so a change during the lookup triggers another
+        if self._windows_changed is not None:
+            self._windows_changed.clear()
         try:
-            result = subprocess.run(['wmctrl', '-l'], capture_output=True, text=True)
-            if result.returncode != 0:
+            windows = self._list_windows()
+            if windows is None:
                 print("Error getting window list")
+                if self._windows_changed is not None:
+                    self._windows_changed.set()
                 return
                 
             # Reset all window IDs
             for window_type in self.windows:
                 self.windows[window_type] = None
                 
-            for line in result.stdout.strip().split('\n'):
-                parts = line.split(None, 3)
-                if len(parts) >= 4:
-                    window_id, desktop, host, title = parts
-                    
-                    # Check Windsurf windows
-                    if any(wt.lower() in title.lower() for wt in self.windsurf_titles):
-                        print(f"Found Windsurf window: {title}")
-                        self.windows['windsurf'] = window_id
-                    # Check Terminal windows
-                    elif any(tt.lower() in title.lower() for tt in self.terminal_titles):
-                        print(f"Found Terminal window: {title}")
-                        self.windows['terminal'] = window_id
-                    # Check Browser windows
-                    elif any(bt.lower() in title.lower() for bt in self.browser_titles):
-                        print(f"Found Browser window: {title}")
-                        self.windows['browser'] = window_id
+            for window_id, title in windows:
+                # First window type with a matching title substring wins
+                for window_type, pattern in self._title_patterns:
+                    if pattern.search(title):
+                        print(f"Found {window_type.capitalize()} window: {title}")
+                        self.windows[window_type] = window_id
+                        break
                         
             print(f"Updated window IDs: {self.windows}")
                         
         except Exception as e:
             print(f"Error updating window positions: {e}")
+            if self._windows_changed is not None:
+                self._windows_changed.set()
 
     def list_windsurf_windows(self):
         """List all Windsurf windows and let user choose one"""
         try:
-            result = subprocess.run(['wmctrl', '-l'], capture_output=True, text=True)
-            if result.returncode != 0:
+            # Always list afresh: the xprop watcher doesn't see title changes
+            windows = self._list_windows()
+            if windows is None:
                 print("Error getting window list")
                 return False
 
-            windsurf_windows = {}
-            for line in result.stdout.strip().split('\n'):
-                parts = line.split(None, 3)
-                if len(parts) >= 4:
-                    window_id, desktop, host, title = parts
-                    # Include any window that has "Windsurf" in the title
-                    if "Windsurf" in title:
-                        normalized_id = self._normalize_window_id(window_id)
-                        windsurf_windows[window_id] = {
-                            'title': title,
-                            'normalized_id': normalized_id
-                        }
+            # Include any window that has "Windsurf" in the title
+            windsurf_windows = {wid: {'title': title, 'hex_id': f'0x{wid:08x}'}
+                                for wid, title in windows if "Windsurf" in title}
         
             if not windsurf_windows:
                 print("No Windsurf windows found")
@@ -288,7 +581,7 @@ class WindowController:
             
             print("\nAvailable Windsurf windows:")
             for i, (wid, info) in enumerate(windsurf_windows.items(), 1):
-                print(f"{i}. {info['title']} (ID: {wid} -> {info['normalized_id']})")
+                print(f"{i}. {info['title']} (ID: {info['hex_id']} -> {wid})")
             
             while True:
                 try:
@@ -305,7 +598,7 @@ class WindowController:
                         chosen_info = windsurf_windows[chosen_id]
                         self.windows['windsurf'] = chosen_id
                         print(f"\nSelected: {chosen_info['title']}")
-                        print(f"Window ID: {chosen_id} (normalized: {chosen_info['normalized_id']})")
+                        print(f"Window ID: {chosen_info['hex_id']} (decimal: {chosen_id})")
                         
                         # Try switching to the window immediately to verify
                         if self.switch_to_window('windsurf'):
@@ -329,44 +622,57 @@ class WindowController:
         print("'q' to quit, 'r' to refresh window list")
         return self.list_windsurf_windows()
 
-    def find_cascade_input(self):
-        """Find and click Cascade's input"""
+    def find_cascade_input(self, screenshot=None, already_active=False):
+        """Find and click Cascade's input
+        
+        Args:
+            screenshot: Screenshot of the Windsurf window to search, or None to capture one
+            already_active: Skip switching to the Windsurf window, for callers that just did
+        """
         try:
             # Make sure we're switched to the Windsurf window
-            if not self.switch_to_window('windsurf'):
+            if not already_active and not self.switch_to_window('windsurf'):
                 print("Could not switch to Windsurf window")
                 return False
-                
-            # Add a delay to ensure window is active
-            time.sleep(self.window_switch_delay)
             
             # Take screenshot
-            screenshot = self.capture_window_screenshot(None)  # We don't need window_info anymore
             if screenshot is None:
-                print("Failed to capture screenshot")
-                return False
+                screenshot = self._capture_active_window()
+                if screenshot is None:
+                    print("Failed to capture screenshot")
+                    return False
             
             # Find Cascade's input
-            input_box = self.input_detector.find_input_box(screenshot)
+            input_box = self.find_input_box(screenshot)
             if not input_box:
                 print("Could not find Cascade input")
                 return False
-
-            # Draw rectangle around detected input box for debugging
-            debug_frame = screenshot.copy()
-            cv2.rectangle(debug_frame, 
-                         (input_box.x, input_box.y), 
-                         (input_box.x + input_box.width, input_box.y + input_box.height), 
-                         (0, 255, 0), 2)
             
-            # Save debug image
-            debug_path = self.save_debug_image(debug_frame, 'detected_input')
-            print(f"Saved debug screenshot to: {debug_path}")
+            print(f"Found input box at: {input_box.click_position}")
+
+            if self.debug:
+                # Draw rectangle around detected input box for debugging, on a
+                # copy of just the box and a small margin rather than the whole frame
+                margin = 20
+                height, width = screenshot.shape[:2]
+                x0 = max(0, input_box.x - margin)
+                y0 = max(0, input_box.y - margin)
+                x1 = min(width, input_box.x + input_box.width + margin)
+                y1 = min(height, input_box.y + input_box.height + margin)
+                debug_frame = cv2.cvtColor(screenshot[y0:y1, x0:x1], cv2.COLOR_BGRA2BGR)
+                cv2.rectangle(debug_frame, 
+                             (input_box.x - x0, input_box.y - y0), 
+                             (input_box.x - x0 + input_box.width, input_box.y - y0 + input_box.height), 
+                             (0, 255, 0), 2)
+                
+                # Save debug image
+                debug_path = self.save_debug_image(debug_frame, 'detected_input')
+                print(f"Saved debug screenshot to: {debug_path}")
             
             # Click the input field
             x, y = input_box.click_position
-            pyautogui.click(x, y)
-            time.sleep(0.5)
+            with _nopause():
+                pyautogui.click(x, y)
             
             return True
             
@@ -381,22 +687,19 @@ class WindowController:
             if not self.switch_to_window('windsurf'):
                 print("Could not switch to Windsurf window")
                 return False
-
-            time.sleep(self.window_switch_delay)  # Wait for window to be active
                 
-            if not self.find_cascade_input():
+            if not self.find_cascade_input(already_active=True):
                 print("Could not find input box")
                 return False
             
             # Copy text to clipboard
             pyperclip.copy(text)
             
-            # Paste using keyboard shortcut
-            pyautogui.hotkey('ctrl', 'v')
-            time.sleep(0.5)
-            
-            # Press enter
-            pyautogui.press('enter')
+            # Paste using keyboard shortcut and press enter; the window has
+            # focus, so the keys arrive in order without waits in between
+            with _nopause():
+                pyautogui.hotkey('ctrl', 'v')
+                pyautogui.press('enter')
             return True
             
         except Exception as e:
@@ -407,12 +710,12 @@ class WindowController:
         """Get the active window's info"""
         try:
             # First get the window ID
-            result = subprocess.run(['xdotool', 'search', '--name', 'windsurf'], capture_output=True, text=True)
-            if result.returncode != 0:
+            windows = self._list_windows()
+            if windows is None:
                 print("Error finding Windsurf window")
                 return None
                 
-            window_ids = result.stdout.strip().split('\n')
+            window_ids = [wid for wid, title in windows if 'windsurf' in title.lower()]
             if not window_ids:
                 print("No Windsurf window found")
                 return None
@@ -420,93 +723,322 @@ class WindowController:
             # Use the last window ID (most recently created)
             window_id = window_ids[-1]
             
-            # Get window geometry
-            result = subprocess.run(['xdotool', 'getwindowgeometry', window_id], capture_output=True, text=True)
-            if result.returncode != 0:
-                print("Error getting window geometry")
-                return None
-                
-            # Parse the geometry output
-            # Example output:
-            # Window 123456789 (windsurf):
-            #   Position: 100,200 (screen: 0)
-            #   Geometry: 800x600
-            output = result.stdout.strip()
-            
-            # Extract position and size using regex
-            import re
-            pos_match = re.search(r'Position: (\d+),(\d+)', output)
-            size_match = re.search(r'Geometry: (\d+)x(\d+)', output)
-            
-            if pos_match and size_match:
-                x = int(pos_match.group(1))
-                y = int(pos_match.group(2))
-                width = int(size_match.group(1))
-                height = int(size_match.group(2))
-                return (x, y, width, height)
-            
-            print("Could not parse window geometry")
-            return None
+            return self._get_window_geometry(window_id)
             
         except Exception as e:
             print(f"Error getting window info: {e}")
             return None
 
-    def capture_window_screenshot(self, window_id: str, filename: str) -> bool:
-        """Capture a screenshot of a specific window
+    def _get_window_geometry(self, window_id):
+        """Get a window's position and size
         
         Args:
             window_id: X window ID
-            filename: Output filename
             
         Returns:
-            bool: True if successful, False otherwise
+            Tuple of (x, y, width, height), or None on failure
         """
-        try:
-            # Ensure screenshots directory exists
-            if not os.path.exists(self.screenshots_dir):
-                os.makedirs(self.screenshots_dir)
-            
-            # Full path to screenshot
-            screenshot_path = os.path.join(self.screenshots_dir, filename)
-            
-            # Try to capture with import command
-            result = subprocess.run(
-                ['import', '-window', window_id, screenshot_path],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                print(f"Error capturing window: {result.stderr}")
-                return False
+        result = subprocess.run(['xdotool', 'getwindowgeometry', str(window_id)],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print("Error getting window geometry")
+            return None
             
-            # Verify the screenshot was created and is valid
-            if not os.path.exists(screenshot_path):
-                print(f"Screenshot file not created: {screenshot_path}")
-                return False
+        # Parse the geometry output
+        # Example output:
+        # Window 123456789 (windsurf):
+        #   Position: 100,200 (screen: 0)
+        #   Geometry: 800x600
+        match = _GEOM_RE.search(result.stdout)
+        if match:
+            return tuple(map(int, match.groups()))
+        
+        print("Could not parse window geometry")
+        return None
+
+    def _grabber(self):
+        """Get the calling thread's screen grabber
+        
+        mss instances are not thread-safe, so keep one per thread.
+        """
+        sct = getattr(self._capture_local, 'sct', None)
+        if sct is None:
+            sct = self._capture_local.sct = mss.mss()
+        return sct
+
+    def _close_grabber(self):
+        """Close the calling thread's screen grabber, if it has one"""
+        sct = getattr(self._capture_local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self._capture_local.sct = None
+
+    def _grab_window(self, window_id):
+        """Grab a window's pixels as a BGRA array backed by the capture buffer
+        
+        Args:
+            window_id: X window ID
             
-            # Try to read with cv2 to verify it's valid
-            img = cv2.imread(screenshot_path)
+        Returns:
+            BGRA image as a numpy array, or None on failure
+        """
+        # Window geometry is looked up once per window until invalidated
+        # (window list update, switch_to_window or wait_for_approval)
+        geometry = self._window_geometry.get(window_id)
+        if geometry is None:
+            geometry = self._get_window_geometry(window_id)
+            if geometry is None:
+                return None
+            self._window_geometry[window_id] = geometry
+        
+        x, y, width, height = geometry
+        try:
+            raw = self._grabber().grab({'left': x, 'top': y, 'width': width, 'height': height})
+        except ScreenShotError as e:
+            # e.g. a window partly off screen, which the screen grab can't read
+            print(f"Screen grab failed, capturing window with import: {e}")
+            return self._import_window(window_id, width, height)
+        return np.frombuffer(raw.raw, dtype=np.uint8).reshape(raw.height, raw.width, 4)
+
+    def _import_window(self, window_id, width, height):
+        """Capture a window with ImageMagick's import as raw BGRA piped over stdout
+        
+        Returns:
+            BGRA image as a numpy array, or None on failure
+        """
+        result = subprocess.run(['import', '-window', str(window_id), '-depth', '8', 'bgra:-'],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        if result.returncode != 0 or len(result.stdout) != width * height * 4:
+            print("Error capturing window with import")
+            return None
+        return np.frombuffer(result.stdout, dtype=np.uint8).reshape(height, width, 4)
+
+    def capture_window_screenshot(self, window_id):
+        """Capture a screenshot of a specific window
+        
+        The pixels are grabbed straight into memory and returned in the
+        screen grab's own BGRA layout, which the input detector reads
+        directly, so no full-frame color conversion or copy is made.
+        
+        Args:
+            window_id: X window ID
+            
+        Returns:
+            BGRA image as a numpy array, or None on failure
+        """
+        try:
+            img = self._grab_window(window_id)
             if img is None:
-                print(f"Failed to read screenshot with OpenCV: {screenshot_path}")
-                return False
+                return None
             
             if self.debug:
-                print(f"Screenshot captured successfully: {screenshot_path}")
-                print(f"Image size: {img.shape}")
+                print(f"Screenshot captured successfully, size: {img.shape}")
             
-            return True
+            return img
             
         except Exception as e:
             print(f"Error capturing screenshot: {e}")
-            return False
+            return None
+
+    def _capture_active_window(self):
+        """Capture a screenshot of the currently focused window
+        
+        Returns:
+            BGRA image as a numpy array, or None on failure
+        """
+        window_id = self._get_active_window_id()
+        if window_id is None:
+            print("Error getting active window")
+            return None
+        return self.capture_window_screenshot(window_id)
+
+    def capture_window_gray(self, window_id):
+        """Capture a grayscale screenshot of a specific window
+        
+        Converts the raw BGRA capture straight to one channel, for OCR and
+        other paths that never need color.
+        
+        Args:
+            window_id: X window ID
+            
+        Returns:
+            Grayscale image as a numpy array, or None on failure
+        """
+        try:
+            bgra = self._grab_window(window_id)
+            if bgra is None:
+                return None
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY)
+            
+        except Exception as e:
+            print(f"Error capturing screenshot: {e}")
+            return None
+
+    def _frame_key(self, image):
+        """Digest identifying a frame's pixels"""
+        # Hash the pixel buffer in place; only crops that aren't contiguous are copied
+        if not image.flags.c_contiguous:
+            image = np.ascontiguousarray(image)
+        return hashlib.sha256(memoryview(image)).digest()
+
+    def _cached(self, cache, key, compute):
+        """Look up key in an LRU cache, computing and storing it on a miss"""
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        value = compute()
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+
+    def _approval_roi(self, gray):
+        """Crop a screenshot to the area where approval buttons appear
+        
+        Returns:
+            Tuple of (roi, (x, y)) where (x, y) is the ROI's offset in gray
+        """
+        height, width = gray.shape[:2]
+        fx0, fy0, fx1, fy1 = self.approval_roi_frac
+        x0, y0 = int(width * fx0), int(height * fy0)
+        return gray[y0:int(height * fy1), x0:int(width * fx1)], (x0, y0)
+
+    def _load_approval_templates(self, filenames):
+        """Load the approval button templates found in the screenshots directory"""
+        templates = {}
+        for label, filename in filenames.items():
+            path = os.path.join(self.screenshots_dir, filename)
+            if not os.path.exists(path):
+                continue
+            template = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if template is None:
+                print(f"Could not load button template: {path}")
+                continue
+            templates[label] = template
+        return templates
+
+    def _match_approval_button(self, roi):
+        """Find an approval button in the ROI by template matching
+        
+        Returns:
+            Tuple of (label, (x, y)) with the button center in roi, or None
+        """
+        best = None
+        for label, template in self._approval_templates.items():
+            th, tw = template.shape
+            if roi.shape[0] < th or roi.shape[1] < tw:
+                continue
+            res = cv2.matchTemplate(roi, template, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(res)
+            if max_val > self.approval_threshold and (best is None or max_val > best[0]):
+                best = (max_val, label, (max_loc[0] + tw // 2, max_loc[1] + th // 2))
+        if best is None:
+            return None
+        return best[1], best[2]
+
+    def _changed_region(self, gray):
+        """Find the area that changed since the previous call
+        
+        Frames are compared as small thumbnails, so the check costs far
+        less than OCR.
+        
+        Args:
+            gray: Grayscale screenshot
+            
+        Returns:
+            (x0, y0, x1, y1) of the changed area in gray, or None if nothing changed
+        """
+        height, width = gray.shape[:2]
+        small = cv2.resize(gray, self.diff_size, interpolation=cv2.INTER_AREA)
+        prev, self._prev_small = self._prev_small, small
+        
+        # First frame (or a resized window): everything changed
+        if prev is None or prev.shape != small.shape or self._prev_frame_shape != gray.shape:
+            self._prev_frame_shape = gray.shape
+            return (0, 0, width, height)
+        
+        diff = cv2.absdiff(small, prev)
+        if diff.max() < self.diff_threshold:
+            return None
+        
+        # Scale the changed thumbnail area back up, padded by one thumbnail pixel
+        x, y, w, h = cv2.boundingRect(cv2.findNonZero((diff >= self.diff_threshold).astype(np.uint8)))
+        sx = width / self.diff_size[0]
+        sy = height / self.diff_size[1]
+        x0 = max(0, int((x - 1) * sx))
+        y0 = max(0, int((y - 1) * sy))
+        x1 = min(width, int((x + w + 1) * sx))
+        y1 = min(height, int((y + h + 1) * sy))
+        return (x0, y0, x1, y1)
+
+    def find_input_box(self, screenshot):
+        """Find Cascade's input box, reusing the result for an unchanged frame"""
+        return self._cached(self._input_cache, self._frame_key(screenshot),
+                            lambda: self.input_detector.find_input_box(screenshot))
+
+    def ocr_words(self, gray):
+        """OCR a grayscale image into words, reusing the result for an unchanged frame
+        
+        Returns:
+            Tuple of (word, (x, y)) pairs with each word's center in gray
+        """
+        return self._cached(self._ocr_cache, self._frame_key(gray),
+                            lambda: self._run_ocr(gray))
+
+    def _run_ocr(self, gray):
+        """Binarize a grayscale image and OCR it as sparse words with their centers"""
+        # Tesseract's runtime grows with pixel count; halve oversized (HiDPI
+        # or full-window) images, which still leaves button text legible
+        scale = 1
+        if gray.shape[0] > self.ocr_max_height:
+            gray = cv2.resize(gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+            scale = 2
+        blur = cv2.GaussianBlur(gray, (3, 3), 0)
+        bw = cv2.adaptiveThreshold(blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                   cv2.THRESH_BINARY, 31, 10)
+        
+        # Word boxes as (text, x, y, width, height)
+        boxes = []
+        if self._tess is not None:
+            height, width = bw.shape
+            self._tess.SetImageBytes(bw.tobytes(), width, height, 1, width)
+            self._tess.Recognize()
+            iterator = self._tess.GetIterator()
+            if iterator is not None:
+                for word in iterate_level(iterator, RIL.WORD):
+                    text = word.GetUTF8Text(RIL.WORD)
+                    box = word.BoundingBox(RIL.WORD)
+                    if text and box:
+                        x0, y0, x1, y1 = box
+                        boxes.append((text, x0, y0, x1 - x0, y1 - y0))
+        else:
+            data = pytesseract.image_to_data(bw, config=self.ocr_config,
+                                             output_type=pytesseract.Output.DICT)
+            boxes = zip(data['text'], data['left'], data['top'], data['width'], data['height'])
+        
+        return tuple((text.strip(), ((x + w // 2) * scale, (y + h // 2) * scale))
+                     for text, x, y, w, h in boxes if text.strip())
+
+    def _open_tesseract(self):
+        """Create a persistent tesserocr API if tesserocr is available"""
+        if PyTessBaseAPI is None:
+            return None
+        try:
+            api = PyTessBaseAPI(psm=PSM.SPARSE_TEXT)
+            api.SetVariable('tessedit_char_whitelist', self.ocr_whitelist)
+            return api
+        except RuntimeError as e:
+            print(f"Could not initialize tesserocr, using pytesseract: {e}")
+            return None
 
     def save_debug_image(self, image, name):
-        """Save debug image to screenshots directory"""
+        """Save debug image to screenshots directory (only in debug mode)"""
+        if not self.debug:
+            return None
         try:
             filename = os.path.join(self.screenshots_dir, f"{name}.png")
-            cv2.imwrite(filename, image)
+            # Fast, light compression: debug frames are written far more often than read
+            cv2.imwrite(filename, image, [cv2.IMWRITE_PNG_COMPRESSION, 1])
             print(f"Saved debug image: {filename}")
             return filename
         except Exception as e:
@@ -514,48 +1046,48 @@ class WindowController:
             return None
 
     def run_command_in_terminal(self):
-        """Run the command specified in .env file in a new terminal"""
+        """Run the command specified in .env file and put its output in the clipboard
+        
+        The command runs in one bash process in the project directory, so no
+        terminal window has to be opened, focused or typed into.
+        
+        Returns:
+            The command output (also left in the clipboard), or None on failure
+        """
         try:
-            # Temporarily disable focus lock while running command
-            was_locked = self.focus_lock['enabled']
-            locked_type = self.focus_lock['window_type']
-            self.disable_focus_lock()
-            
-            # Open new terminal
-            subprocess.Popen(['gnome-terminal', '--', 'bash'], cwd=self.project_dir)
-            time.sleep(2)  # Wait for terminal to open
-
-            # Type cd command to navigate to project directory
-            pyautogui.write(f'cd {self.project_dir}')
-            pyautogui.press('enter')
-            time.sleep(0.5)
-
-            # Type and execute the command
-            pyautogui.write(self.command)
-            pyautogui.press('enter')
-            time.sleep(5)  # Wait for command to complete
-
-            # Get clipboard content (output should be there due to xclip in the command)
-            output = pyperclip.paste()
+            # Output goes to a temporary file rather than a pipe: background
+            # children (e.g. xclip/xsel serving the clipboard) keep inherited
+            # descriptors open, and only bash's own exit is waited for
+            with tempfile.TemporaryFile() as output_file:
+                process = subprocess.Popen(
+                    ['bash', '-c', self.command], cwd=self.project_dir,
+                    stdin=subprocess.DEVNULL, stdout=output_file, stderr=subprocess.STDOUT,
+                    start_new_session=True)
+                try:
+                    process.wait(timeout=self.command_timeout)
+                except subprocess.TimeoutExpired:
+                    # Stop the whole process group, e.g. a test runner left in watch mode
+                    os.killpg(process.pid, signal.SIGKILL)
+                    process.wait()
+                    print(f"Command did not finish within {self.command_timeout} seconds")
+                    return None
+                
+                output_file.seek(0)
+                output = output_file.read().decode(errors='replace')
+            
+            if output:
+                pyperclip.copy(output)
+            else:
+                output = pyperclip.paste()
             print("\nCommand Output:")
             print("-" * 50)
             print(output)
             print("-" * 50)
-
-            # Close terminal
-            pyautogui.write('exit')
-            pyautogui.press('enter')
             
-            # Restore focus lock if it was enabled
-            if was_locked:
-                time.sleep(1)  # Wait for terminal to close
-                self.enable_focus_lock(locked_type)
-                self.switch_to_window(locked_type)
-            
-            return True
+            return output
         except Exception as e:
-            print(f"Error running command in terminal: {e}")
-            return False
+            print(f"Error running command: {e}")
+            return None
 
     def run_test_and_report(self):
         """Complete workflow: run test in terminal and report to Windsurf"""
@@ -563,74 +1095,47 @@ class WindowController:
             print("\nStarting test workflow...")
             
             # Run command and get output
-            if not self.run_command_in_terminal():
+            output = self.run_command_in_terminal()
+            if output is None:
                 print("Failed to run command")
                 return False
             
             try:
-                # Get clipboard content
-                output = pyperclip.paste()
                 if not output:
-                    print("No output in clipboard")
+                    print("No command output captured")
                     return False
-                    
-                print("\nTest output captured:")
-                print("-" * 50)
-                print(output)
-                print("-" * 50)
                 
                 # Switch back to the selected Windsurf window
                 if not self.switch_to_window('windsurf'):
                     print("Could not switch to Windsurf window")
                     return False
                 
-                print("Waiting for window switch...")
-                time.sleep(self.window_switch_delay)
-                
                 # Check focus periodically
                 self.check_and_restore_focus()
                 
                 # Take screenshot of Windsurf window
-                if not self.capture_window_screenshot(
-                    self.windows['windsurf'],
-                    "windsurf_full_shot.png"
-                ):
-                    print("Failed to capture window screenshot")
-                    return False
-                
-                screenshot_path = os.path.join(self.screenshots_dir, "windsurf_full_shot.png")
-                screenshot = cv2.imread(screenshot_path)
+                screenshot = self.capture_window_screenshot(self.windows['windsurf'])
                 if screenshot is None:
-                    print("Failed to read screenshot")
+                    print("Failed to capture window screenshot")
                     return False
                 
-                print(f"Screenshot captured successfully, size: {screenshot.shape}")
-                
-                # Find Cascade input
-                input_box = self.input_detector.find_input_box(screenshot)
-                if not input_box:
+                # Find and click Cascade input in this screenshot
+                if not self.find_cascade_input(screenshot=screenshot, already_active=True):
                     print("Could not find Cascade input")
                     return False
                 
-                print(f"Found input box at: {input_box.click_position}")
-                
-                # Click the input field
-                x, y = input_box.click_position
-                pyautogui.click(x, y)
-                time.sleep(0.5)
-                
-                # Check focus again before pasting
-                self.check_and_restore_focus()
-                
-                # Paste the output
-                pyautogui.hotkey('ctrl', 'v')
-                time.sleep(0.5)
-                
-                # Check focus one last time before pressing enter
-                self.check_and_restore_focus()
-                
-                # Press enter
-                pyautogui.press('enter')
+                with _nopause():
+                    # Check focus again before pasting
+                    self.check_and_restore_focus()
+                    
+                    # Paste the output
+                    pyautogui.hotkey('ctrl', 'v')
+                    
+                    # Check focus one last time before pressing enter
+                    self.check_and_restore_focus()
+                    
+                    # Press enter
+                    pyautogui.press('enter')
                 print("Successfully reported test results")
                 return True
                 
@@ -663,36 +1168,131 @@ class WindowController:
         except Exception as e:
             print(f"Error in run loop: {e}")
 
-    def check_for_approval(self):
-        """Check if there's an approval button and click it"""
-        try:
-            # Get window info
-            window_info = self.get_active_window_info()
-            if not window_info:
-                print("Could not get window info")
-                return False
+    def _capture_approval_frame(self, at=None, stop=None):
+        """Capture the active window in grayscale for an approval check
+        
+        Args:
+            at: Optional time.monotonic() deadline to wait for before capturing
+            stop: Optional threading.Event that cancels the capture while waiting
             
-            # Take screenshot
-            screenshot = self.capture_window_screenshot(None)  # We don't need window_info anymore
-            if screenshot is None:
-                print("Failed to capture screenshot")
-                return False
+        Returns:
+            Tuple of (gray, (x, y)) with the window's screen position, or None on
+            failure or when stopped
+        """
+        if at is not None:
+            delay = max(0.0, at - time.monotonic())
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                return None
+        
+        # Only the active window ID is needed; its geometry is cached by the capture
+        window_id = self._get_active_window_id()
+        if window_id is None:
+            print("Could not get active window")
+            return None
+        
+        # Take grayscale screenshot; matching and OCR never need color
+        gray = self.capture_window_gray(window_id)
+        geometry = self._window_geometry.get(window_id)
+        if gray is None or geometry is None:
+            print("Failed to capture screenshot")
+            return None
+        return gray, geometry[:2]
+
+    def check_for_approval(self, frame=None):
+        """Check if there's an approval button and click it
+        
+        Args:
+            frame: Frame from _capture_approval_frame, or None to capture one now
+        """
+        try:
+            if frame is None:
+                frame = self._capture_approval_frame()
+                if frame is None:
+                    return False
+            gray, (wx, wy) = frame
             
-            # Look for "Approve" or "Run" text in screenshot
-            gray = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
-            text = pytesseract.image_to_string(gray)
+            # Look for the buttons in the action bar area only
+            roi, (rx, ry) = self._approval_roi(gray)
             
-            if "Approve" in text or "Run" in text:
-                print("Found approval button")
-                # TODO: Click approval button
+            # Known button graphics are matched directly; OCR is the fallback
+            match = self._match_approval_button(roi)
+            if match:
+                label, (bx, by) = match
+                print(f"Found {label} button")
+                pyautogui.click(wx + rx + bx, wy + ry + by)
                 return True
             
+            # Only OCR the part of the area that changed since the last check
+            region = self._changed_region(roi)
+            if region is None:
+                words = self._last_approval_words
+            else:
+                # Words outside the changed rectangle are still on screen
+                x0, y0, x1, y1 = region
+                kept = tuple(word for word in self._last_approval_words
+                             if not (x0 <= word[1][0] < x1 and y0 <= word[1][1] < y1))
+                words = kept + tuple((text, (x0 + cx, y0 + cy))
+                                     for text, (cx, cy) in self.ocr_words(roi[y0:y1, x0:x1]))
+                self._last_approval_words = words
+            
+            # Click the first button label found, at its center on screen
+            for text, (cx, cy) in words:
+                if text in self.ocr_labels:
+                    print(f"Found {text} button")
+                    pyautogui.click(wx + rx + cx, wy + ry + cy)
+                    return True
+            
             return False
             
         except Exception as e:
             print(f"Error checking for approval: {e}")
             return False
 
+    def wait_for_approval(self, timeout=60.0, interval=0.5):
+        """Check for an approval button every interval seconds until one is found
+        
+        Each frame is captured on a worker thread, at its scheduled time, while
+        the previous frame is still being matched or OCRed, so capture latency
+        is hidden behind the checks.
+        
+        Returns:
+            bool: True if an approval button was found before the timeout
+        """
+        # Windows may have moved since the last workflow step
+        self._window_geometry.clear()
+        
+        # The capture still scheduled when we return is stopped and waited for,
+        # so nothing keeps capturing after this method returns
+        stop = threading.Event()
+        pending = None
+        try:
+            deadline = time.monotonic() + timeout
+            next_capture = time.monotonic()
+            pending = self._capture_pool.submit(self._capture_approval_frame, next_capture, stop)
+            while True:
+                frame = pending.result()
+                pending = None
+                next_capture += interval
+                if next_capture > deadline:
+                    return frame is not None and self.check_for_approval(frame)
+                pending = self._capture_pool.submit(self._capture_approval_frame, next_capture, stop)
+                if frame is not None and self.check_for_approval(frame):
+                    return True
+        except Exception as e:
+            print(f"Error waiting for approval: {e}")
+            return False
+        finally:
+            stop.set()
+            if pending is not None:
+                try:
+                    pending.result()
+                except Exception:
+                    pass
+
 if __name__ == "__main__":
-    controller = WindowController()
-    controller.run()
+    # Detector diagnostics go through logging; per-match debug output stays off
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    with WindowController() as controller:
+        controller.run()
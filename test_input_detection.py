@@ -3,9 +3,12 @@
 import cv2
 import numpy as np
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Tuple
 import os
 
+TEMPLATE_PATHS = ('screenshots/input.png', 'screenshots/input_new.png')
+
 @dataclass
 class InputBox:
     """Represents a detected input box in the UI"""
@@ -28,18 +31,20 @@ def save_debug_image(image, name):
     cv2.imwrite(filepath, image)
     print(f"Saved: {name}.png")
 
+@lru_cache(maxsize=None)
+def load_templates(paths=TEMPLATE_PATHS):
+    """Load the input box templates as grayscale, once per set of paths"""
+    return tuple(cv2.imread(path, cv2.IMREAD_GRAYSCALE) for path in paths)
+
 def find_input_box(image, debug=True):
     try:
         height, width = image.shape[:2]
         
-        # Load template images
-        template1 = cv2.imread('screenshots/input.png')
-        template2 = cv2.imread('screenshots/input_new.png')
+        # Template images are decoded straight to grayscale on the first call
+        templates = load_templates()
         
-        # Convert all to grayscale
+        # Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        template1_gray = cv2.cvtColor(template1, cv2.COLOR_BGR2GRAY)
-        template2_gray = cv2.cvtColor(template2, cv2.COLOR_BGR2GRAY)
         
         if debug:
             save_debug_image(gray, "1_grayscale")
@@ -47,9 +52,13 @@ def find_input_box(image, debug=True):
         # Only search in right half of image
         right_half = gray[:, width//2:]
         
-        # Try matching both templates
-        matches = []
-        for i, template in enumerate([template1_gray, template2_gray]):
+        # Try matching both templates, storing matches as parallel arrays
+        match_x = np.empty(len(templates), dtype=np.int32)
+        match_y = np.empty(len(templates), dtype=np.int32)
+        match_conf = np.empty(len(templates), dtype=np.float32)
+        match_idx = np.empty(len(templates), dtype=np.int32)
+        n = 0
+        for i, template in enumerate(templates):
             # Match template
             result = cv2.matchTemplate(right_half, template, cv2.TM_CCOEFF_NORMED)
             min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
@@ -61,41 +70,45 @@ def find_input_box(image, debug=True):
                 w = template.shape[1]
                 h = template.shape[0]
                 
-                matches.append({
-                    'x': x + width//2,  # Adjust for right half
-                    'y': y,
-                    'width': w,
-                    'height': h,
-                    'confidence': max_val,
-                    'template_idx': i
-                })
+                match_x[n] = x + width//2  # Adjust for right half
+                match_y[n] = y
+                match_conf[n] = max_val
+                match_idx[n] = i
+                n += 1
                 
                 print(f"Found match with template {i}:")
                 print(f"Position: ({x + width//2}, {y})")
                 print(f"Size: {w}x{h}")
                 print(f"Confidence: {max_val:.3f}")
         
-        if not matches:
+        if n == 0:
             print("No matches found")
             return None
             
         # Use best match
-        best_match = max(matches, key=lambda m: m['confidence'])
-        
-        # Draw debug visualization
-        debug_img = image.copy()
-        cv2.rectangle(debug_img,
-                     (best_match['x'], best_match['y']),
-                     (best_match['x'] + best_match['width'],
-                      best_match['y'] + best_match['height']),
-                     (0, 255, 0), 2)
+        best = int(match_conf[:n].argmax())
+        best_template = templates[match_idx[best]]
+        best_match = {
+            'x': int(match_x[best]),
+            'y': int(match_y[best]),
+            'width': best_template.shape[1],
+            'height': best_template.shape[0],
+            'confidence': float(match_conf[best]),
+        }
         
         # Calculate click position
         click_x = best_match['x'] + best_match['width']//2
         click_y = best_match['y'] + best_match['height']//2
-        cv2.circle(debug_img, (click_x, click_y), 5, (255, 0, 0), -1)
         
         if debug:
+            # Draw debug visualization
+            debug_img = image.copy()
+            cv2.rectangle(debug_img,
+                         (best_match['x'], best_match['y']),
+                         (best_match['x'] + best_match['width'],
+                          best_match['y'] + best_match['height']),
+                         (0, 255, 0), 2)
+            cv2.circle(debug_img, (click_x, click_y), 5, (255, 0, 0), -1)
             save_debug_image(debug_img, "2_detection")
         
         return InputBox(